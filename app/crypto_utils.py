@@ -2,13 +2,15 @@
 from __future__ import annotations
 
 import base64
+import functools
 import hashlib
+import hmac
 import logging
-from datetime import datetime, timezone
+import struct
+import time
 from pathlib import Path
 from typing import Optional
 
-import pyotp
 from cryptography.hazmat.primitives import hashes, serialization
 from cryptography.hazmat.primitives.asymmetric import padding, rsa
 from cryptography.hazmat.primitives.serialization import (
@@ -18,12 +20,24 @@ from cryptography.hazmat.primitives.serialization import (
     PublicFormat,
 )
 
+from app.config import settings
+
 LOGGER = logging.getLogger(__name__)
 
+TOTP_INTERVAL = 30
+
+if getattr(hashlib.sha1, "__module__", None) != "_hashlib":
+    LOGGER.warning(
+        "hashlib.sha1 is not backed by OpenSSL; TOTP HMAC falls back to the "
+        "builtin SHA-1 without hardware acceleration"
+    )
+
 
-def generate_rsa_keypair(bits: int = 4096) -> rsa.RSAPrivateKey:
-    """Return a freshly generated private key."""
+def generate_rsa_keypair(bits: Optional[int] = None) -> rsa.RSAPrivateKey:
+    """Return a freshly generated private key (``settings.rsa_key_bits`` by default)."""
 
+    if bits is None:
+        bits = settings.rsa_key_bits
     return rsa.generate_private_key(public_exponent=65537, key_size=bits)
 
 
@@ -43,29 +57,66 @@ def write_public_key(key: rsa.RSAPublicKey, path: Path) -> None:
     path.write_bytes(pem)
 
 
-def rsa_oaep_decrypt(private_pem_path: Path, ciphertext_b64: str) -> bytes:
-    """Decrypt *ciphertext_b64* using RSA/OAEP-SHA256."""
+@functools.lru_cache(maxsize=8)
+def _load_private(path: Path, mtime_ns: int, size: int) -> rsa.RSAPrivateKey:
+    # mtime_ns and size are only part of the cache key so edits to the PEM
+    # on disk invalidate the cached key object.
+    return serialization.load_pem_private_key(path.read_bytes(), password=None)
+
+
+@functools.lru_cache(maxsize=8)
+def _load_public(path: Path, mtime_ns: int, size: int) -> rsa.RSAPublicKey:
+    return serialization.load_pem_public_key(path.read_bytes())
 
-    private_key = serialization.load_pem_private_key(
-        private_pem_path.read_bytes(), password=None
-    )
-    ciphertext = base64.b64decode(ciphertext_b64)
-    return private_key.decrypt(
-        ciphertext,
-        padding.OAEP(
-            mgf=padding.MGF1(algorithm=hashes.SHA256()),
-            algorithm=hashes.SHA256(),
-            label=None,
-        ),
-    )
+
+def _get_private(path: Path) -> rsa.RSAPrivateKey:
+    """Return the parsed private key at *path*, reusing it while unchanged."""
+
+    stat = path.stat()
+    return _load_private(path, stat.st_mtime_ns, stat.st_size)
+
+
+def _get_public(path: Path) -> rsa.RSAPublicKey:
+    """Return the parsed public key at *path*, reusing it while unchanged."""
+
+    stat = path.stat()
+    return _load_public(path, stat.st_mtime_ns, stat.st_size)
+
+
+def rsa_oaep_decrypt(private_pem_path: Path, ciphertext_b64: str) -> Optional[bytes]:
+    """Decrypt *ciphertext_b64* using RSA/OAEP-SHA256.
+
+    Returns ``None`` on any decoding or padding failure so callers cannot
+    distinguish why a ciphertext was rejected. Malformed Base64 or a wrong
+    ciphertext length still pays for one private-key operation on a dummy
+    block, so those rejections take as long as a padding failure.
+    """
+
+    private_key = _get_private(private_pem_path)
+    key_bytes = (private_key.key_size + 7) // 8
+    try:
+        ciphertext: Optional[bytes] = base64.b64decode(ciphertext_b64, validate=True)
+    except (ValueError, TypeError):
+        ciphertext = None
+    well_formed = ciphertext is not None and len(ciphertext) == key_bytes
+    try:
+        plaintext = private_key.decrypt(
+            ciphertext if well_formed else bytes(key_bytes),
+            padding.OAEP(
+                mgf=padding.MGF1(algorithm=hashes.SHA256()),
+                algorithm=hashes.SHA256(),
+                label=None,
+            ),
+        )
+    except ValueError:
+        return None
+    return plaintext if well_formed else None
 
 
 def rsa_pss_sign(private_pem_path: Path, message: bytes) -> bytes:
     """Sign *message* with RSA-PSS/SHA-256 using maximum salt length."""
 
-    private_key = serialization.load_pem_private_key(
-        private_pem_path.read_bytes(), password=None
-    )
+    private_key = _get_private(private_pem_path)
     signature = private_key.sign(
         message,
         padding.PSS(mgf=padding.MGF1(hashes.SHA256()), salt_length=padding.PSS.MAX_LENGTH),
@@ -77,7 +128,7 @@ def rsa_pss_sign(private_pem_path: Path, message: bytes) -> bytes:
 def rsa_encrypt_with_public(public_pem_path: Path, plaintext: bytes) -> str:
     """Encrypt *plaintext* with RSA/OAEP-SHA256 and return Base64 string."""
 
-    public_key = serialization.load_pem_public_key(public_pem_path.read_bytes())
+    public_key = _get_public(public_pem_path)
     ciphertext = public_key.encrypt(
         plaintext,
         padding.OAEP(
@@ -89,43 +140,127 @@ def rsa_encrypt_with_public(public_pem_path: Path, plaintext: bytes) -> str:
     return base64.b64encode(ciphertext).decode("ascii")
 
 
-def validate_hex_seed(seed: str) -> str:
-    """Validate the decrypted seed is a 64-character lowercase hex string."""
+def parse_hex_seed(seed: str) -> tuple[str, bytes]:
+    """Validate *seed* and return it as lowercase hex plus its raw bytes."""
 
     normalized = seed.strip()
     if len(normalized) != 64:
         raise ValueError("Seed must be 64 hexadecimal characters long")
     try:
-        int(normalized, 16)
+        raw = bytes.fromhex(normalized)
     except ValueError as exc:  # pragma: no cover - guardrail
         raise ValueError("Seed must contain only hexadecimal characters") from exc
-    return normalized.lower()
+    # fromhex() skips whitespace between byte pairs, which would leave us short.
+    if len(raw) != 32:
+        raise ValueError("Seed must contain only hexadecimal characters")
+    return normalized.lower(), raw
+
+
+def validate_hex_seed(seed: str) -> str:
+    """Validate the decrypted seed is a 64-character lowercase hex string."""
+
+    return parse_hex_seed(seed)[0]
+
+
+class TotpContext:
+    """HMAC-SHA1 prototype for one seed plus the codes already derived from it.
+
+    Whoever loads the seed holds the context, so dropping it releases both the
+    keyed HMAC state and its cached codes; nothing secret-derived lives in a
+    module-level cache.
+    """
+
+    __slots__ = ("_prototype", "_codes")
+
+    # Enough time steps for a few verify windows; older ones are never reused.
+    _MAX_CODES = 8
+
+    def __init__(self, key: bytes) -> None:
+        # A string digestmod keeps hmac on CPython's OpenSSL-backed fast path.
+        self._prototype = hmac.new(key, b"", digestmod="sha1")
+        self._codes: dict[int, str] = {}
 
+    def code(self, counter: int) -> str:
+        """Return the code for *counter*, computed at most once per 30s window."""
 
-def hex_to_base32(hexstr: str) -> str:
-    """Convert a hex string to a base32 string suitable for TOTP."""
+        code = self._codes.get(counter)
+        if code is None:
+            code = _totp_raw(self._prototype, counter)
+            if len(self._codes) >= self._MAX_CODES:
+                self._codes.clear()
+            self._codes[counter] = code
+        return code
 
-    raw = bytes.fromhex(hexstr)
-    return base64.b32encode(raw).decode("ascii")
 
+@functools.lru_cache(maxsize=4)
+def _seed_context(seed_hex: str) -> TotpContext:
+    """Return the shared :class:`TotpContext` for an already validated *seed_hex*."""
 
-def generate_totp(seed_hex: str, for_time: Optional[int] = None) -> tuple[str, int]:
-    """Return the TOTP code and seconds remaining in the 30s window."""
+    return TotpContext(bytes.fromhex(seed_hex))
 
-    seed_hex = validate_hex_seed(seed_hex)
-    base32_seed = hex_to_base32(seed_hex)
-    totp = pyotp.TOTP(base32_seed, digits=6, interval=30, digest=hashlib.sha1)
-    code = totp.at(for_time) if for_time else totp.now()
-    period = totp.interval
-    now = int(for_time or datetime.now(tz=timezone.utc).timestamp())
-    remaining = period - (now % period)
-    if remaining == period:
+
+def _totp_raw(prototype: hmac.HMAC, counter: int) -> str:
+    """Compute the RFC 6238 code (SHA-1, 6 digits) for time step *counter*."""
+
+    mac = prototype.copy()
+    mac.update(struct.pack(">Q", counter))
+    digest = mac.digest()
+    offset = digest[-1] & 0x0F
+    code = (
+        (digest[offset] & 0x7F) << 24
+        | digest[offset + 1] << 16
+        | digest[offset + 2] << 8
+        | digest[offset + 3]
+    ) % 1_000_000
+    return f"{code:06d}"
+
+
+def generate_totp_for_context(
+    context: TotpContext, for_time: Optional[int] = None
+) -> tuple[str, int]:
+    """Like :func:`generate_totp` but takes a :class:`TotpContext` directly."""
+
+    now = int(for_time or time.time())
+    code = context.code(now // TOTP_INTERVAL)
+    remaining = TOTP_INTERVAL - (now % TOTP_INTERVAL)
+    if remaining == TOTP_INTERVAL:
         remaining = 0
     return code, remaining
 
 
-def verify_totp(seed_hex: str, code: str, valid_window: int = 1) -> bool:
-    seed_hex = validate_hex_seed(seed_hex)
-    base32_seed = hex_to_base32(seed_hex)
-    totp = pyotp.TOTP(base32_seed, digits=6, interval=30, digest=hashlib.sha1)
-    return totp.verify(code, valid_window=valid_window)
+def verify_totp_for_context(
+    context: TotpContext, code: str, valid_window: int = 1
+) -> bool:
+    """Like :func:`verify_totp` but takes a :class:`TotpContext` directly."""
+
+    counter = int(time.time()) // TOTP_INTERVAL
+    supplied = code.encode("utf-8")
+    # Scan the whole window without an early exit so timing does not depend
+    # on whether (or where) the supplied code matched.
+    match = False
+    for w in range(-valid_window, valid_window + 1):
+        candidate = context.code(counter + w)
+        match |= hmac.compare_digest(candidate.encode("ascii"), supplied)
+    return match
+
+
+def generate_totp(
+    seed_hex: str, for_time: Optional[int] = None, *, trusted: bool = False
+) -> tuple[str, int]:
+    """Return the TOTP code and seconds remaining in the 30s window.
+
+    Pass ``trusted=True`` only when *seed_hex* already came from
+    :func:`validate_hex_seed`.
+    """
+
+    if not trusted:
+        seed_hex = validate_hex_seed(seed_hex)
+    return generate_totp_for_context(_seed_context(seed_hex), for_time)
+
+
+def verify_totp(
+    seed_hex: str, code: str, valid_window: int = 1, *, trusted: bool = False
+) -> bool:
+    if not trusted:
+        seed_hex = validate_hex_seed(seed_hex)
+    return verify_totp_for_context(_seed_context(seed_hex), code, valid_window)
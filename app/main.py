@@ -1,61 +1,143 @@
 """FastAPI application exposing the PKI-backed 2FA microservice."""
 from __future__ import annotations
 
-from fastapi import FastAPI, HTTPException
+import os
+import threading
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, TextIO
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 
 from app.config import ensure_parent, settings
 from app.crypto_utils import (
-    generate_totp,
+    TotpContext,
+    generate_totp_for_context,
+    parse_hex_seed,
     rsa_oaep_decrypt,
     validate_hex_seed,
-    verify_totp,
+    verify_totp_for_context,
 )
 from app.logger import get_logger
 
 LOGGER = get_logger(__name__)
-app = FastAPI(title="PKI 2FA Microservice", version="1.0.0")
+
+
+@asynccontextmanager
+async def _lifespan(_: FastAPI) -> AsyncIterator[None]:
+    yield
+    _close_log()
+
+
+app = FastAPI(
+    title="PKI 2FA Microservice",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=_lifespan,
+)
 
 
 class DecryptSeedRequest(BaseModel):
     encrypted_seed: str | None = None
 
 
-class VerifyRequest(BaseModel):
-    code: str | None = None
-    totp: str | None = None
+def _request_body_schema(*fields: str, required: list[str] | None = None) -> dict:
+    """OpenAPI request body for endpoints that parse the raw JSON themselves."""
 
+    schema: dict = {
+        "type": "object",
+        "properties": {name: {"type": "string"} for name in fields},
+    }
+    if required:
+        schema["required"] = required
+    return {
+        "required": True,
+        "content": {"application/json": {"schema": schema}},
+    }
+
+
+# Resolved once; the handlers below touch these on every request.
+_PRIV_KEY_PATH = settings.private_key_path
+_SEED_PATH = settings.seed_path
+_LOG_PATH = settings.cron_log_path
 
-class VerifyAliasRequest(BaseModel):
-    totp: str
 
+# Long-lived append handle for the cron log, opened on first use, plus the
+# (st_dev, st_ino) it was opened on so a rotated or deleted log is reopened.
+_LOG_FH: TextIO | None = None
+_LOG_ID: tuple[int, int] | None = None
+_LOG_LOCK = threading.Lock()
 
-def _read_seed() -> str:
-    if not settings.seed_path.exists():
-        LOGGER.error("Seed file %s is missing", settings.seed_path)
+# (mtime_ns, validated hex seed, TOTP context) of the last seed file read. The
+# context is rebuilt whenever the seed changes, so it can never go stale.
+_SEED_CACHE: tuple[int, str, TotpContext] | None = None
+
+
+def _load_seed() -> tuple[int, str, TotpContext]:
+    global _SEED_CACHE
+    try:
+        mtime_ns = _SEED_PATH.stat().st_mtime_ns
+    except FileNotFoundError:
+        LOGGER.error("Seed file %s is missing", _SEED_PATH)
         raise HTTPException(status_code=500, detail="Seed not decrypted yet")
-    seed = settings.seed_path.read_text(encoding="utf-8").strip()
+    cached = _SEED_CACHE
+    if cached is not None and cached[0] == mtime_ns:
+        return cached
+    seed = _SEED_PATH.read_text(encoding="utf-8").strip()
     try:
-        return validate_hex_seed(seed)
+        seed, raw = parse_hex_seed(seed)
     except ValueError as exc:
         LOGGER.exception("Seed validation failed")
         raise HTTPException(status_code=500, detail=str(exc)) from exc
+    cached = (mtime_ns, seed, TotpContext(raw))
+    _SEED_CACHE = cached
+    return cached
+
+
+def _get_totp_context() -> TotpContext:
+    return _load_seed()[2]
 
 
 def _write_seed(seed: str) -> None:
-    ensure_parent(settings.seed_path)
-    settings.seed_path.write_text(seed, encoding="utf-8")
+    global _SEED_CACHE
+    ensure_parent(_SEED_PATH)
+    _SEED_PATH.write_text(seed, encoding="utf-8")
+    _SEED_CACHE = None
 
 
 def _append_log(message: str) -> None:
-    ensure_parent(settings.cron_log_path)
-    with settings.cron_log_path.open("a", encoding="utf-8") as fh:
-        fh.write(f"{message}\n")
+    global _LOG_FH, _LOG_ID
+    with _LOG_LOCK:
+        try:
+            stat = _LOG_PATH.stat()
+            current_id: tuple[int, int] | None = (stat.st_dev, stat.st_ino)
+        except FileNotFoundError:
+            current_id = None
+        if _LOG_FH is not None and current_id != _LOG_ID:
+            _LOG_FH.close()
+            _LOG_FH = None
+        if _LOG_FH is None:
+            ensure_parent(_LOG_PATH)
+            # Line-buffered so each entry costs a single write() on an open fd.
+            _LOG_FH = _LOG_PATH.open("a", encoding="utf-8", buffering=1)
+            stat = os.fstat(_LOG_FH.fileno())
+            _LOG_ID = (stat.st_dev, stat.st_ino)
+        _LOG_FH.write(f"{message}\n")
+
+
+def _close_log() -> None:
+    global _LOG_FH, _LOG_ID
+    with _LOG_LOCK:
+        if _LOG_FH is not None:
+            _LOG_FH.close()
+        _LOG_FH = None
+        _LOG_ID = None
 
 
 def _build_totp_payload() -> dict[str, int | str]:
-    seed = _read_seed()
-    code, remaining = generate_totp(seed)
+    code, remaining = generate_totp_for_context(_get_totp_context())
     LOGGER.info("Generated TOTP code with %s seconds remaining", remaining)
     return {
         "code": code,
@@ -65,9 +147,31 @@ def _build_totp_payload() -> dict[str, int | str]:
     }
 
 
+async def _read_json_object(request: Request) -> dict:
+    """Return the JSON object body of *request*.
+
+    The verify endpoints are the hottest path, so they skip Pydantic model
+    construction for what is a single-field payload.
+    """
+
+    try:
+        data = await request.json()
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail="Invalid JSON body") from exc
+    if not isinstance(data, dict):
+        raise HTTPException(status_code=400, detail="Invalid JSON body")
+    return data
+
+
+def _string_field(data: dict, name: str) -> str | None:
+    value = data.get(name)
+    if value is not None and not isinstance(value, str):
+        raise HTTPException(status_code=400, detail=f"{name} must be a string")
+    return value
+
+
 def _verify_code(code: str) -> bool:
-    seed = _read_seed()
-    result = verify_totp(seed, code)
+    result = verify_totp_for_context(_get_totp_context(), code)
     LOGGER.info("Verification attempt %s", "passed" if result else "failed")
     _append_log(f"verify {code} => {result}")
     return result
@@ -79,7 +183,7 @@ async def health() -> dict[str, str]:
 
 
 @app.post("/decrypt-seed")
-async def decrypt_seed(payload: DecryptSeedRequest | None = None) -> dict[str, str]:
+def decrypt_seed(payload: DecryptSeedRequest | None = None) -> dict[str, str]:
     try:
         encrypted_seed = (payload.encrypted_seed if payload else None) or ""
         if not encrypted_seed:
@@ -92,12 +196,19 @@ async def decrypt_seed(payload: DecryptSeedRequest | None = None) -> dict[str, s
                 encoding="utf-8"
             ).strip()
 
-        plaintext = rsa_oaep_decrypt(
-            settings.private_key_path(), encrypted_seed
-        ).decode("utf-8")
-        seed = validate_hex_seed(plaintext)
+        plaintext = rsa_oaep_decrypt(_PRIV_KEY_PATH, encrypted_seed)
+        seed: str | None = None
+        if plaintext is not None:
+            try:
+                seed = validate_hex_seed(plaintext.decode("utf-8"))
+            except ValueError:
+                seed = None
+        # One generic rejection for bad Base64, bad OAEP padding, bad UTF-8 and
+        # bad seed format alike, so the endpoint is not a padding oracle.
+        if seed is None:
+            raise HTTPException(status_code=400, detail="Decryption failed")
         _write_seed(seed)
-        LOGGER.info("Seed decrypted and stored at %s", settings.seed_path)
+        LOGGER.info("Seed decrypted and stored at %s", _SEED_PATH)
     except HTTPException:
         raise
     except Exception as exc:  # pragma: no cover - guard for validation errors
@@ -108,29 +219,41 @@ async def decrypt_seed(payload: DecryptSeedRequest | None = None) -> dict[str, s
 
 
 @app.get("/generate-2fa")
-async def generate_2fa() -> dict[str, int | str]:
+def generate_2fa() -> dict[str, int | str]:
     return _build_totp_payload()
 
 
 @app.get("/generate-totp")
-async def generate_totp_alias() -> dict[str, int | str]:
+def generate_totp_alias() -> dict[str, int | str]:
     return _build_totp_payload()
 
 
-@app.post("/verify-2fa")
-async def verify_2fa(payload: VerifyRequest) -> dict[str, bool]:
-    code = (payload.code or payload.totp or "").strip()
+@app.post(
+    "/verify-2fa",
+    openapi_extra={"requestBody": _request_body_schema("code", "totp")},
+)
+async def verify_2fa(request: Request) -> dict[str, bool]:
+    data = await _read_json_object(request)
+    code = (_string_field(data, "code") or _string_field(data, "totp") or "").strip()
     if not code:
         raise HTTPException(status_code=400, detail="Missing code")
-    result = _verify_code(code)
+    result = await run_in_threadpool(_verify_code, code)
     return {"valid": result, "verified": result}
 
 
 @app.post("/run-totp")
-async def run_totp() -> dict[str, str | int]:
+def run_totp() -> dict[str, str | int]:
     return _build_totp_payload()
 
 
-@app.post("/verify")
-async def verify_alias(payload: VerifyAliasRequest) -> dict[str, bool]:
-    return {"verified": _verify_code(payload.totp)}
+@app.post(
+    "/verify",
+    openapi_extra={"requestBody": _request_body_schema("totp", required=["totp"])},
+)
+async def verify_alias(request: Request) -> dict[str, bool]:
+    data = await _read_json_object(request)
+    totp = _string_field(data, "totp")
+    if totp is None:
+        raise HTTPException(status_code=400, detail="Missing totp")
+    # Passed through as-is: an empty code is simply reported as not verified.
+    return {"verified": await run_in_threadpool(_verify_code, totp)}
@@ -24,7 +24,9 @@ def main() -> None:
 
     ciphertext = settings.encrypted_seed_path.read_text(encoding="utf-8").strip()
     try:
-        plaintext = rsa_oaep_decrypt(settings.private_key_path(), ciphertext)
+        plaintext = rsa_oaep_decrypt(settings.private_key_path, ciphertext)
+        if plaintext is None:
+            raise ValueError("Encrypted seed could not be decrypted")
         seed = validate_hex_seed(plaintext.decode("utf-8"))
     except Exception:  # pragma: no cover - guard for crypto issues
         logger.exception("Failed to decrypt seed")
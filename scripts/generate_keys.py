@@ -1,4 +1,4 @@
-"""Generate the student RSA 4096-bit key pair."""
+"""Generate the student RSA key pair (size from ``RSA_KEY_BITS``)."""
 from __future__ import annotations
 
 import logging
@@ -27,15 +27,15 @@ def main() -> None:
     logger = logging.getLogger("generate_keys")
 
     ensure_parent(settings.key_dir / "placeholder")
-    private_path = settings.private_key_path()
-    public_path = settings.public_key_path()
+    private_path = settings.private_key_path
+    public_path = settings.public_key_path
 
     if private_path.exists() or public_path.exists():
         logger.info("Existing key material detected; aborting to avoid overwrite")
         return
 
-    logger.info("Generating 4096-bit RSA key pair")
-    private_key = generate_rsa_keypair(bits=4096)
+    logger.info("Generating %s-bit RSA key pair", settings.rsa_key_bits)
+    private_key = generate_rsa_keypair()
     write_private_key(private_key, private_path)
     write_public_key(private_key.public_key(), public_path)
     set_permissions(private_path)
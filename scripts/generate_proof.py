@@ -1,9 +1,11 @@
 """Create the commit proof bundle required by the assignment."""
 from __future__ import annotations
 
+import io
 import logging
 import subprocess
 import tarfile
+import time
 from datetime import datetime, timezone
 from pathlib import Path
 import sys
@@ -12,6 +14,7 @@ ROOT_DIR = Path(__file__).resolve().parents[1]
 if str(ROOT_DIR) not in sys.path:
     sys.path.insert(0, str(ROOT_DIR))
 
+from app.config import ensure_parent
 from app.crypto_utils import rsa_encrypt_with_public, rsa_pss_sign
 from app.logger import configure_logging
 
@@ -34,11 +37,6 @@ def get_local_paths():
     }
 
 
-def ensure_parent(path: Path) -> None:
-    """Ensure the directory for path exists."""
-    path.parent.mkdir(parents=True, exist_ok=True)
-
-
 def run_git_command(*args: str) -> str:
     result = subprocess.check_output(["git", *args], cwd=ROOT_DIR, text=True).strip()
     return result
@@ -83,10 +81,18 @@ def write_readme(commit_hash: str, paths: dict) -> Path:
 
 def bundle_artifacts(artifact_paths: list[Path], tar_path: Path) -> None:
     ensure_parent(tar_path)
-    with tarfile.open(tar_path, "w:gz") as tar:
-        for item in artifact_paths:
-            if item.exists():
-                tar.add(item, arcname=item.name)
+    # The signature and Base64 ciphertext are already high-entropy, so higher
+    # zlib levels only burn CPU without shrinking the archive.
+    members = [(item.name, item.read_bytes()) for item in artifact_paths if item.exists()]
+    mtime = int(time.time())
+    with tarfile.open(tar_path, "w:gz", compresslevel=1) as tar:
+        for name, data in members:
+            # Build headers from the bytes already in memory instead of letting
+            # tar.add() stat each file.
+            info = tarfile.TarInfo(name=name)
+            info.size = len(data)
+            info.mtime = mtime
+            tar.addfile(info, io.BytesIO(data))
 
 
 def main() -> None:
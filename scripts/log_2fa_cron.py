@@ -22,7 +22,7 @@ def read_seed() -> str:
 
 def main() -> None:
     seed = read_seed()
-    code, _ = generate_totp(seed)
+    code, _ = generate_totp(seed, trusted=True)
     timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
 
     ensure_parent(settings.cron_log_path)
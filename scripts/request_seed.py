@@ -4,12 +4,13 @@ from __future__ import annotations
 import json
 import logging
 import sys
-import time
 from pathlib import Path
 from typing import Any
 
 import requests
 from requests import Response
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
 if str(ROOT_DIR) not in sys.path:
@@ -20,34 +21,55 @@ from app.logger import configure_logging
 
 TIMEOUT_SECONDS = 10
 MAX_ATTEMPTS = 2
+RETRY_DELAY_SECONDS = 2
 
 
 def load_public_key() -> str:
-    path = settings.public_key_path()
+    path = settings.public_key_path
     if not path.exists():
         raise FileNotFoundError(f"Public key not found at {path}")
     return path.read_text(encoding="utf-8")
 
 
+class _FixedDelayRetry(Retry):
+    """Retry that waits RETRY_DELAY_SECONDS before every retry.
+
+    urllib3's exponential backoff is zero before the first retry, and with
+    MAX_ATTEMPTS == 2 that is the only retry there is.
+    """
+
+    def get_backoff_time(self) -> float:
+        return RETRY_DELAY_SECONDS if self.history else 0
+
+
+def _build_session() -> requests.Session:
+    session = requests.Session()
+    retry = _FixedDelayRetry(
+        total=MAX_ATTEMPTS - 1,
+        status_forcelist=[500, 502, 503, 504],
+        allowed_methods=None,  # the seed request is a POST
+    )
+    adapter = HTTPAdapter(max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+_SESSION = _build_session()
+
+
 def send_request(payload: dict[str, Any]) -> Response:
-    last_exc: Exception | None = None
-    for attempt in range(1, MAX_ATTEMPTS + 1):
-        try:
-            response = requests.post(
-                settings.seed_endpoint,
-                json=payload,
-                headers={"Content-Type": "application/json"},
-                timeout=TIMEOUT_SECONDS,
-            )
-            response.raise_for_status()
-            return response
-        except Exception as exc:  # pragma: no cover - network edge cases
-            last_exc = exc
-            logging.error("Seed request attempt %s failed: %s", attempt, exc)
-            if attempt < MAX_ATTEMPTS:
-                time.sleep(2)
-    assert last_exc is not None
-    raise last_exc
+    try:
+        response = _SESSION.post(
+            settings.seed_endpoint,
+            json=payload,
+            timeout=TIMEOUT_SECONDS,
+        )
+        response.raise_for_status()
+    except Exception as exc:  # pragma: no cover - network edge cases
+        logging.error("Seed request failed: %s", exc)
+        raise
+    return response
 
 
 def main() -> None: